@@ -1,10 +1,14 @@
 from flask import Flask
 from config import Config
+from utils.data_loader import configure_fixed_width
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    configure_fixed_width(
+        app.config["FIXED_WIDTH_LAYOUT_FILE"], app.config["FIXED_WIDTH_EXTENSIONS"]
+    )
 
     from app import routes
 
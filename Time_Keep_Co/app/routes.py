@@ -1,21 +1,83 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory
 from werkzeug.utils import secure_filename
+import hmac
 import os
 import logging
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
 from typing import Dict, Tuple, Any
-from utils.data_loader import load_tar_file, load_ecb_file
+from utils.data_loader import (
+    STREAM_READERS,
+    compression,
+    file_format,
+    load_ecb_file,
+    load_tar_file,
+)
 from utils.comparator import TransactionComparator, format_discrepancies
+from utils.profiling import profile_request, list_profiles
 
 logger = logging.getLogger(__name__)
 main = Blueprint("main", __name__)
 
+INVALID_FILE_TYPE = (
+    "Only CSV, Parquet, Arrow and fixed-width files "
+    "(CSV, Arrow stream and fixed-width optionally gzip, zstd or zip compressed) are allowed"
+)
+
+# Rollup cubes of recent comparisons, keyed by comparison id (LRU). This is
+# per-process memory: drill-down requests must reach the worker that ran the
+# comparison, so run a single worker process (threads are fine).
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+
+
+def store_cube(cube) -> str:
+    comparison_id = uuid.uuid4().hex
+    with _cubes_lock:
+        _cubes[comparison_id] = cube
+        # Evict least recently used cubes, always keeping the newest one
+        while len(_cubes) > 1 and (
+            len(_cubes) > current_app.config["CUBE_CACHE_SIZE"]
+            or sum(len(c) for c in _cubes.values()) > current_app.config["CUBE_CACHE_MAX_CELLS"]
+        ):
+            _cubes.popitem(last=False)
+    return comparison_id
+
 
 def allowed_file(filename: str) -> bool:
-    return (
-        "." in filename
-        and filename.rsplit(".", 1)[1].lower()
-        in current_app.config["ALLOWED_EXTENSIONS"]
-    )
+    if "." not in filename:
+        return False
+    codec = compression(filename)
+    if codec and codec not in current_app.config["ALLOWED_COMPRESSIONS"]:
+        return False
+    fmt = file_format(filename)
+    # A bare .zip is checked against its member file name when loaded
+    if codec == "zip" and not fmt:
+        return True
+    if codec and fmt not in STREAM_READERS:
+        # e.g. .parquet.gz: the format needs random access, not a stream
+        return False
+    return fmt in current_app.config["ALLOWED_EXTENSIONS"]
+
+
+def admin_allowed() -> bool:
+    # Admin features are disabled unless ADMIN_TOKEN is configured
+    token = current_app.config["ADMIN_TOKEN"]
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token)
+
+
+def profiling_requested() -> bool:
+    rate = current_app.config["PROFILE_SAMPLE_RATE"]
+    if rate > 0 and random.random() < rate:
+        return True
+    # Explicit opt-in is an admin feature: profiling is costly on demand
+    opted_in = request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1"
+    return opted_in and admin_allowed()
 
 
 @main.route("/")
@@ -25,12 +87,20 @@ def index():
 
 @main.route("/compare", methods=["POST"])
 def compare_files() -> Tuple[Dict[str, Any], int]:
+    saved_uploads = []
     try:
         if current_app.config["DEV_MODE"]:
             # Use default files if paths are provided
             tar_path = request.form.get("tar_file_path", None)
             ecb_path = request.form.get("ecb_file_path", None)
 
+            # Validate uploads before anything is written to UPLOAD_FOLDER
+            for side, path in (("tar_file", tar_path), ("ecb_file", ecb_path)):
+                upload = request.files.get(side)
+                if not path and upload and upload.filename and not allowed_file(upload.filename):
+                    logger.error("Invalid file type submitted")
+                    return jsonify({"error": INVALID_FILE_TYPE}), 400
+
             if not tar_path and (
                 "tar_file" in request.files and request.files["tar_file"].filename
             ):
@@ -40,6 +110,7 @@ def compare_files() -> Tuple[Dict[str, Any], int]:
                     secure_filename(tar_file.filename),
                 )
                 tar_file.save(tar_path)
+                saved_uploads.append(tar_path)
 
             if not ecb_path and (
                 "ecb_file" in request.files and request.files["ecb_file"].filename
@@ -50,6 +121,7 @@ def compare_files() -> Tuple[Dict[str, Any], int]:
                     secure_filename(ecb_file.filename),
                 )
                 ecb_file.save(ecb_path)
+                saved_uploads.append(ecb_path)
 
             if not tar_path or not ecb_path:
                 return jsonify({"error": "Both TAR and ECB files are required"}), 400
@@ -67,7 +139,7 @@ def compare_files() -> Tuple[Dict[str, Any], int]:
                 allowed_file(tar_file.filename) and allowed_file(ecb_file.filename)
             ):
                 logger.error("Invalid file type submitted")
-                return jsonify({"error": "Only CSV files are allowed"}), 400
+                return jsonify({"error": INVALID_FILE_TYPE}), 400
 
             # Process files
             logger.info(
@@ -87,30 +159,88 @@ def compare_files() -> Tuple[Dict[str, Any], int]:
 
             tar_file.save(tar_path)
             ecb_file.save(ecb_path)
+            saved_uploads.extend([tar_path, ecb_path])
+
+        # Only pay for profiling when it was asked for
+        if profiling_requested():
+            profiler = profile_request(
+                os.path.abspath(current_app.config["PROFILE_FOLDER"]),
+                current_app.config["PROFILE_RETENTION"],
+            )
+        else:
+            profiler = nullcontext()
 
-        try:
-            tar_data = load_tar_file(tar_path)
-            ecb_data = load_ecb_file(ecb_path)
-        except Exception as e:
-            logger.error(f"Error loading files: {str(e)}")
-            return jsonify({"error": "Error processing files"}), 500
+        with profiler as profile_id:
+            try:
+                tar_data = load_tar_file(tar_path)
+                ecb_data = load_ecb_file(ecb_path)
+            except Exception as e:
+                logger.error(f"Error loading files: {str(e)}")
+                # Don't leave unreadable uploads behind in UPLOAD_FOLDER
+                for path in saved_uploads:
+                    os.remove(path)
+                return jsonify({"error": "Error processing files"}), 500
 
-        comparator = TransactionComparator()
-        discrepancies = comparator.compare_files(tar_data, ecb_data)
+            comparator = TransactionComparator()
+            discrepancies = comparator.compare_files(tar_data, ecb_data)
 
-        # Calculate total records
-        total_records = len(set(list(tar_data.keys()) + list(ecb_data.keys())))
+            # Calculate total records
+            total_records = len(set(list(tar_data.keys()) + list(ecb_data.keys())))
+
+            formatted = format_discrepancies(discrepancies)
 
         # Cleanup
         os.remove(tar_path)
         os.remove(ecb_path)
 
         # Return discrepancies along with total records
-        return jsonify({
-            "discrepancies": format_discrepancies(discrepancies),
-            "total_records": total_records
-        })
+        response = {
+            "discrepancies": formatted,
+            "total_records": total_records,
+            "comparison_id": store_cube(comparator.cube),
+        }
+        if profile_id:
+            response["profile_id"] = profile_id
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@main.route("/compare/<comparison_id>/rollup")
+def rollup(comparison_id: str) -> Tuple[Dict[str, Any], int]:
+    with _cubes_lock:
+        cube = _cubes.get(comparison_id)
+        if cube is not None:
+            _cubes.move_to_end(comparison_id)
+    if cube is None:
+        return jsonify({"error": "Unknown or expired comparison"}), 404
+
+    # An omitted filter rolls the dimension up; an empty one selects unassigned
+    return jsonify(
+        cube.slice(
+            system=request.args.get("system"),
+            prin=request.args.get("prin"),
+            agent=request.args.get("agent"),
+            service_code=request.args.get("service_code"),
+        )
+    )
+
+
+@main.route("/admin/profiles")
+def profiles() -> Tuple[Dict[str, Any], int]:
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(list_profiles(os.path.abspath(current_app.config["PROFILE_FOLDER"])))
+
+
+@main.route("/admin/profiles/<filename>")
+def download_profile(filename: str):
+    if not admin_allowed():
+        return jsonify({"error": "Forbidden"}), 403
+    return send_from_directory(
+        os.path.abspath(current_app.config["PROFILE_FOLDER"]),
+        filename,
+        as_attachment=True,
+    )
@@ -4,7 +4,34 @@ import os
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY") or "dev-key-please-change"
     UPLOAD_FOLDER = "uploads"
-    ALLOWED_EXTENSIONS = {"csv"}
+    # Fixed-width extracts need a JSON layout file; without one they are rejected
+    FIXED_WIDTH_LAYOUT_FILE = os.environ.get("FIXED_WIDTH_LAYOUT_FILE")
+    FIXED_WIDTH_EXTENSIONS = set(
+        filter(None, os.environ.get("FIXED_WIDTH_EXTENSIONS", "dat").split(","))
+    )
+    ALLOWED_EXTENSIONS = {"csv", "parquet", "arrow", "feather"} | (
+        FIXED_WIDTH_EXTENSIONS if FIXED_WIDTH_LAYOUT_FILE else set()
+    )
+    ALLOWED_COMPRESSIONS = {"gz", "zst", "zstd", "zip"}
+    # Drill-down cubes are cached in process memory, so /compare/<id>/rollup
+    # only works when served by a single worker process
+    CUBE_CACHE_SIZE = int(os.environ.get("CUBE_CACHE_SIZE", "20"))
+    CUBE_CACHE_MAX_CELLS = int(os.environ.get("CUBE_CACHE_MAX_CELLS", "2000000"))
+
+    # Opt-in /compare profiling: X-Profile: 1 header, ?profile=1 or sampling
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_FOLDER = os.environ.get("PROFILE_FOLDER", "profiles")
+    PROFILE_RETENTION = int(os.environ.get("PROFILE_RETENTION", "20"))
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
     DEV_MODE = os.environ.get("DEV_MODE", "True") == "True"
     DEFAULT_TAR_FILE = os.environ.get("DEFAULT_TAR_FILE", "/Users/cvk/Downloads/[CODE] Local Projects/Dell_TakeHome/ServiceCodes_TAR.csv")
     DEFAULT_ECB_FILE = os.environ.get("DEFAULT_ECB_FILE", "/Users/cvk/Downloads/[CODE] Local Projects/Dell_TakeHome/ServiceCodes_ECB.csv")
+
+    # Watch-folder daemon (watch.py)
+    WATCH_TAR_DIR = os.environ.get("WATCH_TAR_DIR", "incoming/tar")
+    WATCH_ECB_DIR = os.environ.get("WATCH_ECB_DIR", "incoming/ecb")
+    WATCH_OUTPUT_DIR = os.environ.get("WATCH_OUTPUT_DIR", "results")
+    WATCH_STATE_FILE = os.environ.get("WATCH_STATE_FILE", "results/processed.json")
+    WATCH_INTERVAL = int(os.environ.get("WATCH_INTERVAL", "30"))
+    WATCH_STABLE_SECONDS = int(os.environ.get("WATCH_STABLE_SECONDS", "10"))
+    WATCH_MAX_WORKERS = int(os.environ.get("WATCH_MAX_WORKERS", "2"))
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Add project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TAR_CSV = """SPA,Service Code,Charge,Stop Date,New Charge
+815510000020,DF001, $12.00 ,013120, $ 12.50
+815510000030,DF003,12.00,013120,
+"""
+
+
+@pytest.fixture
+def tar_csv(tmp_path):
+    path = tmp_path / "ServiceCodes_TAR.csv"
+    path.write_text(TAR_CSV)
+    return path
+
+
+@pytest.fixture
+def expected_tar():
+    return {
+        ("815510000020", "DF001"): {"Charge": 12.0, "Stop Date": "013120", "New Charge": 12.5},
+        ("815510000030", "DF003"): {"Charge": 12.0, "Stop Date": "013120", "New Charge": 0.0},
+    }
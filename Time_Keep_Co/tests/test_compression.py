@@ -0,0 +1,72 @@
+import gzip
+import shutil
+import zipfile
+
+import pytest
+
+from utils.data_loader import load_tar_file
+
+
+def test_load_gzip(tar_csv, expected_tar, tmp_path):
+    path = tmp_path / "tar.csv.gz"
+    with open(tar_csv, "rb") as src, gzip.open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    assert load_tar_file(str(path)) == expected_tar
+
+
+def test_load_zstd(tar_csv, expected_tar, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "tar.csv.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(tar_csv.read_bytes()))
+    assert load_tar_file(str(path)) == expected_tar
+
+
+def test_load_zip_uses_supported_member(tar_csv, expected_tar, tmp_path):
+    path = tmp_path / "tar.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("README.txt", "not data")
+        archive.write(tar_csv, "ServiceCodes_TAR.csv")
+    assert load_tar_file(str(path)) == expected_tar
+
+
+def test_compressed_parquet_rejected(tmp_path):
+    path = tmp_path / "tar.parquet.gz"
+    path.write_bytes(gzip.compress(b""))
+    with pytest.raises(ValueError):
+        load_tar_file(str(path))
+
+
+def _arrow_table():
+    pa = pytest.importorskip("pyarrow")
+    return pa, pa.table(
+        {
+            "SPA": ["815510000020"],
+            "Service Code": ["DF001"],
+            "Charge": [12.0],
+            "Stop Date": ["013120"],
+            "New Charge": [12.5],
+        }
+    )
+
+
+def test_load_gzipped_arrow_stream(tmp_path):
+    pa, table = _arrow_table()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    path = tmp_path / "tar.arrow.gz"
+    path.write_bytes(gzip.compress(sink.getvalue().to_pybytes()))
+    assert load_tar_file(str(path)) == {
+        ("815510000020", "DF001"): {"Charge": 12.0, "Stop Date": "013120", "New Charge": 12.5}
+    }
+
+
+def test_gzipped_arrow_file_format_rejected(tmp_path):
+    pa, table = _arrow_table()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    path = tmp_path / "tar.arrow.gz"
+    path.write_bytes(gzip.compress(sink.getvalue().to_pybytes()))
+    with pytest.raises(ValueError, match="IPC stream format"):
+        load_tar_file(str(path))
@@ -0,0 +1,28 @@
+import datetime
+from decimal import Decimal
+
+from utils.data_cleaner import clean_currency, clean_date
+
+
+def test_clean_currency_strings():
+    assert clean_currency(" $ 12.50 ") == 12.5
+    assert clean_currency("$12.00") == 12.0
+    assert clean_currency("12.00") == 12.0
+    assert clean_currency("") == 0.0
+
+
+def test_clean_currency_typed_values():
+    assert clean_currency(12) == 12.0
+    assert clean_currency(12.5) == 12.5
+    assert clean_currency(Decimal("1.5")) == 1.5
+    assert clean_currency(None) == 0.0
+
+
+def test_clean_date_strings():
+    assert clean_date(" 013120 ") == "013120"
+    assert clean_date(None) == ""
+
+
+def test_clean_date_typed_values():
+    assert clean_date(datetime.date(2020, 1, 31)) == "013120"
+    assert clean_date(datetime.datetime(2020, 1, 31, 8, 30)) == "013120"
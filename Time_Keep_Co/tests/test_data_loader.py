@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from utils import data_loader
+from utils.data_loader import (
+    compression,
+    configure_fixed_width,
+    file_format,
+    load_ecb_file,
+    load_tar_file,
+)
+
+ECB_CSV = """SPA,Service Code,Record Desc,Charge,Stop Date,New Charge,System,Prin,Agent
+815510000020,DF001,IA V/D MODEM, $12.00 ,013120, $ 12.50 ,8155,1000,0020
+"""
+
+@pytest.fixture(autouse=True)
+def reset_fixed_width():
+    yield
+    configure_fixed_width()
+
+
+@pytest.mark.parametrize(
+    "filename, fmt, codec",
+    [
+        ("tar.csv", "csv", None),
+        ("tar.CSV.GZ", "csv", "gz"),
+        ("tar.parquet", "parquet", None),
+        ("tar.arrow.zst", "arrow", "zst"),
+        ("tar.zip", "", "zip"),
+    ],
+)
+def test_format_and_compression(filename, fmt, codec):
+    assert file_format(filename) == fmt
+    assert compression(filename) == codec
+
+
+def test_load_csv(tar_csv, expected_tar, tmp_path):
+    assert load_tar_file(str(tar_csv)) == expected_tar
+
+    ecb = tmp_path / "ServiceCodes_ECB.csv"
+    ecb.write_text(ECB_CSV)
+    assert load_ecb_file(str(ecb))[("815510000020", "DF001")]["Agent"] == "0020"
+
+
+def test_unsupported_formats(tmp_path):
+    path = tmp_path / "tar.xlsx"
+    path.write_text("")
+    with pytest.raises(ValueError):
+        load_tar_file(str(path))
+
+
+def test_load_parquet_typed_columns(tmp_path, expected_tar):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    import datetime
+    from decimal import Decimal
+
+    table = pa.table(
+        {
+            "SPA": ["815510000020", "815510000030"],
+            "Service Code": ["DF001", "DF003"],
+            "Charge": pa.array([Decimal("12.00"), Decimal("12.00")], pa.decimal128(10, 2)),
+            "Stop Date": pa.array([datetime.date(2020, 1, 31)] * 2, pa.date32()),
+            "New Charge": [12.5, None],
+            "Unused": [1, 2],
+        }
+    )
+    path = tmp_path / "tar.parquet"
+    pq.write_table(table, path)
+    assert load_tar_file(str(path)) == expected_tar
+
+
+def test_arrow_missing_column(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"SPA": ["815510000020"], "Service Code": ["DF001"], "Charge": [1.0]})
+    path = tmp_path / "tar.arrow"
+    with pa.ipc.new_file(str(path), table.schema) as writer:
+        writer.write_table(table)
+    with pytest.raises(ValueError, match="Stop Date"):
+        load_tar_file(str(path))
+
+
+def test_fixed_width_requires_layout(tmp_path, expected_tar):
+    layout = tmp_path / "layout.json"
+    layout.write_text(
+        json.dumps(
+            {
+                "tar": [
+                    ["SPA", 0, 12],
+                    ["Service Code", 12, 17],
+                    ["Charge", 17, 23],
+                    ["Stop Date", 23, 29],
+                    ["New Charge", 29, 35],
+                ]
+            }
+        )
+    )
+    path = tmp_path / "tar.dat"
+    path.write_text("815510000020DF001 12.00013120 12.50\n\n815510000030DF003 12.00013120      \n")
+
+    assert "dat" not in data_loader.READERS
+    with pytest.raises(ValueError):
+        load_tar_file(str(path))
+
+    configure_fixed_width(str(layout), {"dat"})
+    assert load_tar_file(str(path)) == expected_tar
+    # No ECB layout was configured
+    with pytest.raises(ValueError):
+        load_ecb_file(str(path))
+
+    configure_fixed_width()
+    assert "dat" not in data_loader.READERS
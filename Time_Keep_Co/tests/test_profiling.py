@@ -0,0 +1,48 @@
+import os
+import tracemalloc
+
+from utils.profiling import list_profiles, profile_request
+
+
+def _work():
+    return sum(i * i for i in range(1000))
+
+
+def test_writes_dumps_and_keeps_newest(tmp_path):
+    ids = []
+    for _ in range(4):
+        with profile_request(str(tmp_path), retention=2) as profile_id:
+            _work()
+        ids.append(profile_id)
+
+    profiles = list_profiles(str(tmp_path))
+    assert [p["id"] for p in profiles] == ids[:1:-1]
+    assert profiles[0]["files"] == [f"{ids[-1]}{ext}" for ext in (".prof", ".tracemalloc", ".txt")]
+
+
+def test_concurrent_request_runs_unprofiled(tmp_path):
+    with profile_request(str(tmp_path), retention=5) as outer:
+        with profile_request(str(tmp_path), retention=5) as inner:
+            _work()
+    assert outer is not None
+    assert inner is None
+
+
+def test_save_failure_does_not_fail_request(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    with profile_request(str(blocker), retention=5) as profile_id:
+        _work()
+    assert profile_id is not None
+    assert not tracemalloc.is_tracing()
+
+
+def test_leaves_existing_tracing_running(tmp_path):
+    tracemalloc.start()
+    try:
+        with profile_request(str(tmp_path), retention=5):
+            _work()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert len(os.listdir(tmp_path)) == 3
@@ -0,0 +1,103 @@
+import pytest
+
+from utils.comparator import TransactionComparator
+from utils.rollup import RollupCube
+
+
+@pytest.fixture
+def cube():
+    cube = RollupCube()
+    cube.add(("8155", "1000", "0020", "DF001"), "charge_mismatch", charge_delta=2.0)
+    cube.add(("8155", "1000", "0030", "DF001"), "missing_from_tar", charge_delta=12.0)
+    cube.add(("8155", "2000", "0020", "DF003"), "charge_mismatch", charge_delta=-1.0)
+    cube.add(("8156", "1000", "0020", "DF001"), "new_charge_mismatch", new_charge_delta=0.5)
+    cube.freeze()
+    return cube
+
+
+def test_grand_total_drills_into_systems(cube):
+    result = cube.slice()
+    assert result["totals"]["count"] == 4
+    assert result["totals"]["charge_delta"] == 13.0
+    assert result["drill_dimension"] == "system"
+    assert [(c["value"], c["count"]) for c in result["children"]] == [("8155", 3), ("8156", 1)]
+
+
+def test_drill_down_path(cube):
+    assert [c["value"] for c in cube.slice(system="8155")["children"]] == ["1000", "2000"]
+    result = cube.slice(system="8155", prin="1000")
+    assert result["drill_dimension"] == "agent"
+    assert [(c["value"], c["by_type"]) for c in result["children"]] == [
+        ("0020", {"charge_mismatch": 1}),
+        ("0030", {"missing_from_tar": 1}),
+    ]
+    leaf = cube.slice(system="8155", prin="1000", agent="0020", service_code="DF001")
+    assert leaf["drill_dimension"] is None
+    assert leaf["children"] == []
+    assert leaf["totals"]["count"] == 1
+
+
+def test_slice_on_non_leading_dimension(cube):
+    result = cube.slice(service_code="DF001")
+    assert result["totals"]["count"] == 3
+    assert result["drill_dimension"] == "system"
+    assert [(c["value"], c["count"]) for c in result["children"]] == [("8155", 2), ("8156", 1)]
+
+    result = cube.slice(prin="1000", service_code="DF001")
+    assert result["totals"]["count"] == 3
+
+
+def test_unknown_slice_is_empty(cube):
+    result = cube.slice(system="9999")
+    assert result["totals"]["count"] == 0
+    assert result["children"] == []
+
+
+def test_every_rollup_is_precomputed(cube):
+    # 16 rollups per leaf, shared where leaves overlap
+    assert (None, None, None, None) in cube.cells
+    assert len(cube) == len(cube.cells)
+
+
+def test_comparator_derives_hierarchy_from_spa():
+    tar = {("815510000020", "DF001"): {"Charge": 12.0, "Stop Date": "013120", "New Charge": 12.5}}
+    ecb = {
+        ("815520000030", "DF003"): {
+            "Charge": 10.0,
+            "Stop Date": "013120",
+            "New Charge": 0.0,
+            "Record Desc": "",
+            "System": "8155",
+            "Prin": "2000",
+            "Agent": "0030",
+        }
+    }
+    comparator = TransactionComparator()
+    comparator.compare_files(tar, ecb)
+
+    missing = comparator.cube.slice(system="8155", prin="1000", agent="0020")
+    assert missing["totals"]["by_type"] == {"missing_from_ecb": 1}
+    assert missing["totals"]["charge_delta"] == -12.0
+    assert comparator.cube.slice(system="8155", prin="2000")["totals"]["charge_delta"] == 10.0
+
+
+def test_short_spa_rolls_up_with_matching_ecb_agent():
+    ecb_record = {
+        "Charge": 5.0,
+        "Stop Date": "013120",
+        "New Charge": 0.0,
+        "Record Desc": "",
+        "System": "8155",
+        "Prin": "1000",
+        "Agent": "TOT",
+    }
+    # Blank-padded "81551000TOT " is stripped to 11 characters by the loader
+    tar = {("81551000TOT", "DF001"): {"Charge": 12.0, "Stop Date": "013120", "New Charge": 0.0}}
+    ecb = {("81551000TOT", "DF003"): ecb_record}
+    comparator = TransactionComparator()
+    comparator.compare_files(tar, ecb)
+
+    result = comparator.cube.slice(system="8155", prin="1000")
+    assert [(c["value"], c["by_type"]) for c in result["children"]] == [
+        ("TOT", {"missing_from_ecb": 1, "missing_from_tar": 1}),
+    ]
@@ -0,0 +1,122 @@
+import io
+
+import pytest
+
+pytest.importorskip("flask")
+
+from app import create_app, routes
+from utils.rollup import RollupCube
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True)
+    routes._cubes.clear()
+    yield app
+    routes._cubes.clear()
+
+
+@pytest.mark.parametrize(
+    "filename, allowed",
+    [
+        ("tar.csv", True),
+        ("tar.csv.gz", True),
+        ("tar.CSV.ZST", True),
+        ("tar.arrow.zip", True),
+        ("tar.parquet.gz", False),
+        ("tar.feather.zst", False),
+        ("tar.arrow.gz", True),
+        ("tar.zip", True),
+        ("tar.parquet", True),
+        ("tar.gz", False),
+        ("tar.txt.gz", False),
+        ("tar.bz2", False),
+        ("tar", False),
+    ],
+)
+def test_allowed_file(app, filename, allowed):
+    with app.app_context():
+        assert routes.allowed_file(filename) is allowed
+
+
+def test_compressed_parquet_upload_rejected_before_saving(app, tmp_path):
+    app.config.update(DEV_MODE=True, UPLOAD_FOLDER=str(tmp_path / "uploads"))
+    response = app.test_client().post(
+        "/compare",
+        data={
+            "tar_file": (io.BytesIO(b"data"), "t.parquet.gz"),
+            "ecb_file": (io.BytesIO(b"data"), "e.csv"),
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 400
+    assert not (tmp_path / "uploads").exists()
+
+
+def _cube(cells):
+    cube = RollupCube()
+    for i in range(cells // 16):
+        cube.add((str(i), "1000", "0020", "DF001"), "charge_mismatch")
+    cube.freeze()
+    return cube
+
+
+def test_cube_cache_evicts_by_count_and_cells(app):
+    app.config.update(CUBE_CACHE_SIZE=3, CUBE_CACHE_MAX_CELLS=10_000)
+    with app.app_context():
+        ids = [routes.store_cube(_cube(16)) for _ in range(4)]
+        assert list(routes._cubes) == ids[1:]
+
+        app.config.update(CUBE_CACHE_MAX_CELLS=len(routes._cubes[ids[-1]]) * 2)
+        newest = routes.store_cube(_cube(16))
+        assert list(routes._cubes) == [ids[-1], newest]
+
+
+def test_rollup_endpoint(app):
+    client = app.test_client()
+    with app.app_context():
+        comparison_id = routes.store_cube(_cube(32))
+
+    result = client.get(f"/compare/{comparison_id}/rollup?system=1").get_json()
+    assert result["totals"]["count"] == 1
+    assert result["drill_dimension"] == "prin"
+    assert client.get("/compare/unknown/rollup").status_code == 404
+
+
+def _upload(client, tmp_path, **kwargs):
+    tar = tmp_path / "tar.csv"
+    ecb = tmp_path / "ecb.csv"
+    tar.write_text("SPA,Service Code,Charge,Stop Date,New Charge\n815510000020,DF001,12.00,013120,12.50\n")
+    ecb.write_text(
+        "SPA,Service Code,Record Desc,Charge,Stop Date,New Charge,System,Prin,Agent\n"
+        "815510000020,DF001,X,12.00,013120,12.75,8155,1000,0020\n"
+    )
+    return client.post(
+        "/compare",
+        data={"tar_file_path": str(tar), "ecb_file_path": str(ecb)},
+        **kwargs,
+    )
+
+
+def test_profiling_opt_in_requires_admin_token(app, tmp_path):
+    app.config.update(DEV_MODE=True, PROFILE_FOLDER=str(tmp_path / "profiles"), ADMIN_TOKEN=None)
+    client = app.test_client()
+
+    response = _upload(client, tmp_path, headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert "profile_id" not in response.get_json()
+    assert client.get("/admin/profiles").status_code == 403
+
+    app.config.update(ADMIN_TOKEN="secret")
+    admin = {"X-Admin-Token": "secret"}
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    response = _upload(client, tmp_path, headers=dict(admin, **{"X-Profile": "1"}))
+    profile_id = response.get_json()["profile_id"]
+    profiles = client.get("/admin/profiles", headers=admin).get_json()
+    assert profiles[0]["id"] == profile_id
+
+    download = client.get(f"/admin/profiles/{profile_id}.txt", headers=admin)
+    assert download.status_code == 200
+    assert b"Wall time" in download.data
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils.watcher import FolderWatcher, pair_key
+
+TAR_CSV = """SPA,Service Code,Charge,Stop Date,New Charge
+815510000020,DF001,12.00,013120,12.50
+815510000030,DF001,12.00,013120,12.50
+"""
+
+ECB_CSV = """SPA,Service Code,Record Desc,Charge,Stop Date,New Charge,System,Prin,Agent
+815510000020,DF001,IA V/D MODEM, $12.00 ,013120, $ 12.75 ,8155,1000,0020
+"""
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ("ServiceCodes_TAR_0131.csv.gz", ("TAR", "ServiceCodes_0131")),
+        ("ServiceCodes_ECB_0131.csv", ("ECB", "ServiceCodes_0131")),
+        ("tar-extract.parquet", ("TAR", "extract")),
+        ("ECB.csv", ("ECB", "")),
+        ("STARTER_0131.csv", (None, "STARTER_0131")),
+    ],
+)
+def test_pair_key(filename, expected):
+    assert pair_key(filename) == expected
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    paths = {name: tmp_path / name for name in ("tar", "ecb", "out")}
+    for path in paths.values():
+        path.mkdir()
+    return paths
+
+
+@pytest.fixture
+def watcher(dirs):
+    w = FolderWatcher(
+        str(dirs["tar"]),
+        str(dirs["ecb"]),
+        str(dirs["out"]),
+        str(dirs["out"] / "processed.json"),
+        stable_seconds=0,
+        max_workers=1,
+    )
+    yield w
+    w.shutdown()
+
+
+def _drain(watcher, timeout=30):
+    # Two polls: the first records size/mtime, the second sees them stable
+    watcher.poll_once()
+    watcher.poll_once()
+    deadline = time.monotonic() + timeout
+    while watcher._in_flight:
+        assert time.monotonic() < deadline, "reconciliation did not finish"
+        time.sleep(0.05)
+
+
+def test_reconciles_stable_pair_once(watcher, dirs):
+    (dirs["tar"] / "SC_TAR_0131.csv").write_text(TAR_CSV)
+    (dirs["ecb"] / "SC_ECB_0131.csv").write_text(ECB_CSV)
+    _drain(watcher)
+
+    result = json.loads((dirs["out"] / "SC_0131.json").read_text())
+    assert result["total_records"] == 2
+    assert {d["type"] for d in result["discrepancies"]} == {
+        "missing_from_ecb",
+        "new_charge_mismatch",
+    }
+    assert watcher.find_ready_pairs() == []
+
+
+def test_failed_pair_retried_only_after_change(watcher, dirs):
+    tar = dirs["tar"] / "SC_TAR_0131.csv"
+    tar.write_text("not,a,tar,file\n1,2,3,4\n")
+    (dirs["ecb"] / "SC_ECB_0131.csv").write_text(ECB_CSV)
+    _drain(watcher)
+
+    state = json.loads((dirs["out"] / "processed.json").read_text())
+    assert "error" in state["SC_0131"]
+    assert watcher.find_ready_pairs() == []
+
+    tar.write_text(TAR_CSV)
+    os.utime(tar, (time.time() - 5, time.time() - 5))
+    watcher.poll_once()
+    assert [key for key, _, _ in watcher.find_ready_pairs()] == ["SC_0131"]
+
+
+def test_skips_empty_and_duplicate_keys(watcher, dirs):
+    (dirs["ecb"] / "ECB.csv").write_text(ECB_CSV)
+    (dirs["ecb"] / "SC_ECB_0131.csv").write_text(ECB_CSV)
+    (dirs["ecb"] / "SC_ECB_0131.csv.gz").write_bytes(b"")
+    assert watcher._scan(str(dirs["ecb"]), "ECB") == {}
+
+
+def test_survives_missing_directory_and_forgets_removed_files(watcher, dirs):
+    tar = dirs["tar"] / "SC_TAR_0131.csv"
+    tar.write_text(TAR_CSV)
+    (dirs["ecb"] / "SC_ECB_0131.csv").write_text(ECB_CSV)
+    watcher.poll_once()
+    assert str(tar) in watcher._seen
+
+    tar.unlink()
+    watcher.poll_once()
+    assert str(tar) not in watcher._seen
+
+    watcher.tar_dir = str(dirs["tar"] / "missing")
+    watcher.poll_once()
+    assert not watcher._in_flight
+
+    watcher.tar_dir = str(dirs["tar"])
+    tar.write_text(TAR_CSV)
+    watcher.poll_once()
+    assert [key for key, _, _ in watcher.find_ready_pairs()] == ["SC_0131"]
+
+
+def test_broken_loader_pool_is_rebuilt_and_pair_retried(watcher, dirs):
+    # Kill a loader process, as an OOM kill would
+    crashed = watcher._loaders.submit(os._exit, 1)
+    with pytest.raises(BrokenProcessPool):
+        crashed.result(timeout=30)
+    broken = watcher._loaders
+
+    (dirs["tar"] / "SC_TAR_0131.csv").write_text(TAR_CSV)
+    (dirs["ecb"] / "SC_ECB_0131.csv").write_text(ECB_CSV)
+    _drain(watcher)
+    assert "SC_0131" not in watcher.processed
+    assert watcher._loaders is not broken
+
+    _drain(watcher)
+    assert "result" in watcher.processed["SC_0131"]
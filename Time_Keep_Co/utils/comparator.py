@@ -1,10 +1,38 @@
+from .rollup import RollupCube
+
+
+def _hierarchy(spa, service_code, ecb_record=None):
+    if ecb_record is not None:
+        return (ecb_record["System"], ecb_record["Prin"], ecb_record["Agent"], service_code)
+    # TAR-only records: the SPA is System + Prin + Agent, 4 characters each.
+    # The loader strips blank padding ("81551000TOT "), so pad it back and
+    # strip each part to match the stripped ECB fields.
+    spa = spa.ljust(12)
+    return (spa[0:4].strip(), spa[4:8].strip(), spa[8:12].strip(), service_code)
+
+
 class TransactionComparator:
     def __init__(self):
         self.discrepancies = []
+        self.cube = RollupCube()
 
     def add_discrepancy(
-        self, disc_type, spa, service_code, tar_value=None, ecb_value=None
+        self,
+        disc_type,
+        spa,
+        service_code,
+        tar_value=None,
+        ecb_value=None,
+        ecb_record=None,
+        charge_delta=0.0,
+        new_charge_delta=0.0,
     ):
+        self.cube.add(
+            _hierarchy(spa, service_code, ecb_record),
+            disc_type,
+            charge_delta,
+            new_charge_delta,
+        )
         self.discrepancies.append(
             {
                 "type": disc_type,
@@ -19,7 +47,13 @@ class TransactionComparator:
         # Check records in TAR missing from ECB
         for key in tar_data:
             if key not in ecb_data:
-                self.add_discrepancy("missing_from_ecb", key[0], key[1])
+                self.add_discrepancy(
+                    "missing_from_ecb",
+                    key[0],
+                    key[1],
+                    charge_delta=-tar_data[key]["Charge"],
+                    new_charge_delta=-tar_data[key]["New Charge"],
+                )
             else:
                 # Compare fields that should match
                 tar_record = tar_data[key]
@@ -32,6 +66,8 @@ class TransactionComparator:
                         key[1],
                         tar_record["Charge"],
                         ecb_record["Charge"],
+                        ecb_record,
+                        charge_delta=ecb_record["Charge"] - tar_record["Charge"],
                     )
 
                 if tar_record["Stop Date"] != ecb_record["Stop Date"]:
@@ -41,6 +77,7 @@ class TransactionComparator:
                         key[1],
                         tar_record["Stop Date"],
                         ecb_record["Stop Date"],
+                        ecb_record,
                     )
 
                 if (tar_record["New Charge"] or ecb_record["New Charge"]) and \
@@ -51,13 +88,23 @@ class TransactionComparator:
                         key[1],
                         tar_record["New Charge"],
                         ecb_record["New Charge"],
+                        ecb_record,
+                        new_charge_delta=ecb_record["New Charge"] - tar_record["New Charge"],
                     )
 
         # Check records in ECB missing from TAR
         for key in ecb_data:
             if key not in tar_data:
-                self.add_discrepancy("missing_from_tar", key[0], key[1])
+                self.add_discrepancy(
+                    "missing_from_tar",
+                    key[0],
+                    key[1],
+                    ecb_record=ecb_data[key],
+                    charge_delta=ecb_data[key]["Charge"],
+                    new_charge_delta=ecb_data[key]["New Charge"],
+                )
 
+        self.cube.freeze()
         return self.discrepancies
 
 
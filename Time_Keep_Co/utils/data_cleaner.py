@@ -1,5 +1,12 @@
+import datetime
+import numbers
+
+
 def clean_currency(value):
     """Convert currency strings like ' $ 12.50 ' or '$12.00' to float, handle empty values"""
+    # Already typed (Parquet/Arrow sources), including decimal128 -> Decimal
+    if isinstance(value, numbers.Number):
+        return float(value)
     if not value or value.strip() == '':
         return 0.0
 
@@ -17,6 +24,11 @@ def clean_currency(value):
 
 def clean_date(value):
     """Normalize date format MMDDYY"""
+    if value is None:
+        return ""
+    # Typed date32/timestamp columns (datetime is a subclass of date)
+    if isinstance(value, datetime.date):
+        return value.strftime("%m%d%y")
     if isinstance(value, str):
         value = value.strip()
         if len(value) == 6:  # Already in MMDDYY format
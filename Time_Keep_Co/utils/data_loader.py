@@ -1,35 +1,217 @@
 import csv
+import gzip
+import io
+import json
 import os
+import zipfile
+from contextlib import contextmanager
 from .data_cleaner import clean_currency, clean_date
 
+TAR_COLUMNS = ["SPA", "Service Code", "Charge", "Stop Date", "New Charge"]
+ECB_COLUMNS = TAR_COLUMNS + ["Record Desc", "System", "Prin", "Agent"]
 
-def load_tar_file(filepath):
-    tar_data = {}
-    with open(filepath, "r") as f:
+# Fixed-width layouts per side ("tar"/"ecb") as (column, start, end) character
+# offsets. There is no built-in layout; see configure_fixed_width().
+FIXED_WIDTH_LAYOUTS = {}
+
+
+def _open_text(source):
+    # ``source`` is a path, or a binary stream coming out of a decompressor
+    if isinstance(source, str):
+        return open(source, "r")
+    return io.TextIOWrapper(source, newline="")
+
+
+def _read_csv(source, columns, layout=None):
+    with _open_text(source) as f:
         reader = csv.DictReader(f)
         for row in reader:
-            key = (row["SPA"].strip(), row["Service Code"].strip())
-            tar_data[key] = {
-                "Charge": clean_currency(row["Charge"]),
-                "Stop Date": clean_date(row["Stop Date"]),
-                "New Charge": clean_currency(row["New Charge"]),
-            }
+            yield row
+
+
+def _read_fixed_width(source, columns, layout=None):
+    if layout is None:
+        raise ValueError("No fixed-width layout configured, set FIXED_WIDTH_LAYOUT_FILE")
+    missing = set(columns) - {name for name, _, _ in layout}
+    if missing:
+        raise ValueError(f"Fixed-width layout is missing columns: {sorted(missing)}")
+    fields = [(name, start, end) for name, start, end in layout if name in columns]
+    with _open_text(source) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            yield {name: line[start:end] for name, start, end in fields}
+
+
+def _iter_record_batches(batches, columns):
+    for batch in batches:
+        indices = [batch.schema.get_field_index(c) for c in columns]
+        missing = [c for c, i in zip(columns, indices) if i < 0]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+        values = [batch.column(i).to_pylist() for i in indices]
+        for row in zip(*values):
+            yield dict(zip(columns, row))
+
+
+def _read_parquet(filepath, columns, layout=None):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(filepath)
+    # Only the projected column chunks of each row group are decoded
+    yield from _iter_record_batches(parquet_file.iter_batches(columns=columns), columns)
+
+
+def _read_arrow(filepath, columns, layout=None):
+    import pyarrow as pa
+
+    with pa.memory_map(filepath, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+        yield from _iter_record_batches(batches, columns)
+
+
+def _read_arrow_stream(stream, columns, layout=None):
+    import pyarrow as pa
+
+    # Only the IPC stream format can be read without seeking; the file format
+    # starts with the ARROW1 magic and keeps its schema in a trailing footer
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+    if stream.peek(6)[:6] == b"ARROW1":
+        raise ValueError("Compressed Arrow must be IPC stream format, not IPC file format")
+    yield from _iter_record_batches(pa.ipc.open_stream(stream), columns)
+
+
+READERS = {
+    "csv": _read_csv,
+    "parquet": _read_parquet,
+    "arrow": _read_arrow,
+    "feather": _read_arrow,
+}
+
+# Readers that can consume a non-seekable decompression stream. Parquet needs
+# random access to its footer and is already compressed internally.
+STREAM_READERS = {
+    "csv": _read_csv,
+    "arrow": _read_arrow_stream,
+}
+
+COMPRESSIONS = {"gz", "zst", "zstd", "zip"}
+
+
+def configure_fixed_width(layout_file=None, extensions=()):
+    """Load TAR/ECB layouts from a JSON file and map ``extensions`` to them.
+
+    The file holds ``{"tar": [[column, start, end], ...], "ecb": [...]}``.
+    Without a layout file no extension is treated as fixed-width.
+    """
+    for registry in (READERS, STREAM_READERS):
+        for ext in [e for e, reader in registry.items() if reader is _read_fixed_width]:
+            del registry[ext]
+    FIXED_WIDTH_LAYOUTS.clear()
+    if not layout_file:
+        return
+
+    with open(layout_file) as f:
+        layouts = json.load(f)
+    for side in ("tar", "ecb"):
+        if side in layouts:
+            FIXED_WIDTH_LAYOUTS[side] = [
+                (name, int(start), int(end)) for name, start, end in layouts[side]
+            ]
+    for ext in extensions:
+        READERS[ext] = _read_fixed_width
+        STREAM_READERS[ext] = _read_fixed_width
+
+
+def compression(filepath):
+    """Return the compression suffix of a file, or None if uncompressed"""
+    ext = os.path.splitext(filepath)[1].lstrip(".").lower()
+    return ext if ext in COMPRESSIONS else None
+
+
+def file_format(filepath):
+    """Return the reader key for a file based on its extension"""
+    if compression(filepath):
+        filepath = os.path.splitext(filepath)[0]
+    return os.path.splitext(filepath)[1].lstrip(".").lower()
+
+
+@contextmanager
+def _open_compressed(filepath, codec):
+    """Yield ``(format, stream)`` decompressing ``filepath`` on the fly"""
+    if codec == "zip":
+        with zipfile.ZipFile(filepath) as archive:
+            members = [
+                m for m in archive.infolist()
+                if not m.is_dir() and file_format(m.filename) in STREAM_READERS
+            ]
+            if not members:
+                raise ValueError(f"No supported file found in archive: '{filepath}'")
+            with archive.open(members[0]) as stream:
+                yield file_format(members[0].filename), stream
+        return
+
+    if codec == "gz":
+        stream = gzip.open(filepath, "rb")
+    else:
+        import zstandard
+
+        stream = zstandard.ZstdDecompressor().stream_reader(open(filepath, "rb"))
+    with stream:
+        yield file_format(filepath), stream
+
+
+def read_rows(filepath, columns, layout=None):
+    """Yield rows of ``filepath`` as dicts limited to ``columns``"""
+    codec = compression(filepath)
+    if codec is None:
+        fmt = file_format(filepath)
+        if fmt not in READERS:
+            raise ValueError(f"Unsupported file format: '{fmt}'")
+        yield from READERS[fmt](filepath, columns, layout)
+        return
+
+    with _open_compressed(filepath, codec) as (fmt, stream):
+        if fmt not in STREAM_READERS:
+            raise ValueError(f"Unsupported compressed file format: '{fmt}.{codec}'")
+        yield from STREAM_READERS[fmt](stream, columns, layout)
+
+
+def _strip(value):
+    if value is None:
+        return ""
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def load_tar_file(filepath, layout=None):
+    tar_data = {}
+    for row in read_rows(filepath, TAR_COLUMNS, layout or FIXED_WIDTH_LAYOUTS.get("tar")):
+        key = (_strip(row["SPA"]), _strip(row["Service Code"]))
+        tar_data[key] = {
+            "Charge": clean_currency(row["Charge"]),
+            "Stop Date": clean_date(row["Stop Date"]),
+            "New Charge": clean_currency(row["New Charge"]),
+        }
     return tar_data
 
 
-def load_ecb_file(filepath):
+def load_ecb_file(filepath, layout=None):
     ecb_data = {}
-    with open(filepath, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            key = (row["SPA"].strip(), row["Service Code"].strip())
-            ecb_data[key] = {
-                "Charge": clean_currency(row["Charge"]),
-                "Stop Date": clean_date(row["Stop Date"]),
-                "New Charge": clean_currency(row["New Charge"]),
-                "Record Desc": row["Record Desc"].strip(),
-                "System": row["System"].strip(),
-                "Prin": row["Prin"].strip(),
-                "Agent": row["Agent"].strip(),
-            }
+    for row in read_rows(filepath, ECB_COLUMNS, layout or FIXED_WIDTH_LAYOUTS.get("ecb")):
+        key = (_strip(row["SPA"]), _strip(row["Service Code"]))
+        ecb_data[key] = {
+            "Charge": clean_currency(row["Charge"]),
+            "Stop Date": clean_date(row["Stop Date"]),
+            "New Charge": clean_currency(row["New Charge"]),
+            "Record Desc": _strip(row["Record Desc"]),
+            "System": _strip(row["System"]),
+            "Prin": _strip(row["Prin"]),
+            "Agent": _strip(row["Agent"]),
+        }
     return ecb_data
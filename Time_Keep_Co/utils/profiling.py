@@ -0,0 +1,111 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+TRACEMALLOC_FRAMES = 10
+
+# cProfile and tracemalloc are process-wide, so only one request is profiled
+# at a time; concurrent requests run unprofiled
+_active = threading.Lock()
+
+
+def _summary(profiler, snapshot, peak, elapsed):
+    out = io.StringIO()
+    out.write(f"Wall time: {elapsed:.3f}s\n")
+    out.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+    out.write("Top functions by cumulative time\n")
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+    out.write("\nTop allocations by line\n")
+    for stat in snapshot.statistics("lineno")[:20]:
+        out.write(f"{stat}\n")
+    return out.getvalue()
+
+
+def _prune(folder, retention):
+    for profile in list_profiles(folder)[retention:]:
+        for name in profile["files"]:
+            os.remove(os.path.join(folder, name))
+
+
+def _save(folder, retention, profile_id, profiler, snapshot, peak, elapsed):
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, profile_id)
+    profiler.dump_stats(f"{base}.prof")
+    snapshot.dump(f"{base}.tracemalloc")
+    with open(f"{base}.txt", "w") as f:
+        f.write(_summary(profiler, snapshot, peak, elapsed))
+    _prune(folder, retention)
+
+
+def _new_profile_id(label):
+    # Nanosecond suffix keeps ids in creation order within the same second
+    now = time.time_ns()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now // 10**9))
+    return f"{stamp}.{now % 10**9:09d}-{label}-{uuid.uuid4().hex[:8]}"
+
+
+@contextmanager
+def profile_request(folder, retention, label="compare"):
+    """Capture a CPU profile and allocation snapshot of the enclosed block.
+
+    Yields the profile id, or None if another request is being profiled.
+    Writes ``<id>.prof`` (pstats), ``<id>.tracemalloc`` and ``<id>.txt``.
+    Failing to save the dumps is logged and never fails the request.
+    """
+    if not _active.acquire(blocking=False):
+        logger.warning("Profiling already in progress, running request unprofiled")
+        yield None
+        return
+
+    try:
+        profile_id = _new_profile_id(label)
+        # Leave tracing alone if something else in the process started it
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield profile_id
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if owns_tracing:
+                tracemalloc.stop()
+
+            try:
+                _save(folder, retention, profile_id, profiler, snapshot, peak, elapsed)
+                logger.info(f"Saved profile {profile_id} ({elapsed:.3f}s, peak {peak} bytes)")
+            except Exception as e:
+                logger.error(f"Error saving profile {profile_id}: {str(e)}")
+    finally:
+        _active.release()
+
+
+def list_profiles(folder):
+    """Return stored profiles, newest first"""
+    if not os.path.isdir(folder):
+        return []
+    profiles = {}
+    for name in os.listdir(folder):
+        profile_id, ext = os.path.splitext(name)
+        if ext not in (".prof", ".tracemalloc", ".txt"):
+            continue
+        profile = profiles.setdefault(profile_id, {"id": profile_id, "files": []})
+        profile["files"].append(name)
+    for profile in profiles.values():
+        profile["files"].sort()
+    # Ids start with a sortable timestamp
+    return sorted(profiles.values(), key=lambda p: p["id"], reverse=True)
@@ -0,0 +1,60 @@
+from collections import defaultdict
+
+DIMENSIONS = ("system", "prin", "agent", "service_code")
+
+
+def _empty_cell():
+    return {"count": 0, "by_type": {}, "charge_delta": 0.0, "new_charge_delta": 0.0}
+
+
+class RollupCube:
+    """Discrepancy counts and charge deltas by System -> Prin -> Agent -> Service Code.
+
+    Every combination of fixed and rolled-up (None) dimensions is aggregated as
+    discrepancies are added, so any rollup or slice is a single dict lookup.
+    """
+
+    def __init__(self):
+        self.cells = {}
+        # Slice key -> values of its first rolled-up dimension, for drill-down
+        self.children = defaultdict(set)
+
+    def add(self, coords, disc_type, charge_delta=0.0, new_charge_delta=0.0):
+        for mask in range(1 << len(DIMENSIONS)):
+            key = tuple(v if mask >> i & 1 else None for i, v in enumerate(coords))
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = _empty_cell()
+            cell["count"] += 1
+            cell["by_type"][disc_type] = cell["by_type"].get(disc_type, 0) + 1
+            cell["charge_delta"] += charge_delta
+            cell["new_charge_delta"] += new_charge_delta
+
+            # Register key as a child of each slice that drills down into it
+            for i, value in enumerate(key):
+                if value is None:
+                    break
+                self.children[key[:i] + (None,) + key[i + 1:]].add(value)
+
+    def __len__(self):
+        """Number of precomputed cells, a proxy for memory use"""
+        return len(self.cells)
+
+    def freeze(self):
+        """Sort drill-down children once so queries don't have to"""
+        self.children = {k: sorted(v) for k, v in self.children.items()}
+
+    def slice(self, system=None, prin=None, agent=None, service_code=None):
+        key = (system, prin, agent, service_code)
+        drill = next((i for i, v in enumerate(key) if v is None), None)
+        children = []
+        if drill is not None:
+            for value in self.children.get(key, ()):
+                child = key[:drill] + (value,) + key[drill + 1:]
+                children.append(dict(self.cells[child], value=value))
+        return {
+            "filters": dict(zip(DIMENSIONS, key)),
+            "totals": self.cells.get(key, _empty_cell()),
+            "drill_dimension": DIMENSIONS[drill] if drill is not None else None,
+            "children": children,
+        }
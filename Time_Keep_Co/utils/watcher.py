@@ -0,0 +1,279 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .comparator import TransactionComparator, format_discrepancies
+from .data_loader import (
+    READERS,
+    compression,
+    configure_fixed_width,
+    file_format,
+    load_ecb_file,
+    load_tar_file,
+)
+
+logger = logging.getLogger(__name__)
+
+# "ServiceCodes_TAR_0131.csv.gz" and "ServiceCodes_ECB_0131.csv" share the
+# pair key "ServiceCodes_0131"
+SIDE_TOKEN = re.compile(r"(?i)(^|[_\-. ])(TAR|ECB)(?=$|[_\-. ])")
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file in the target directory, then rename over ``path``"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _stem(filename):
+    name = os.path.basename(filename)
+    if compression(name):
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+def pair_key(filename):
+    """Return ``(side, key)`` for a file name, side being "TAR", "ECB" or None"""
+    stem = _stem(filename)
+    match = SIDE_TOKEN.search(stem)
+    if not match:
+        return None, stem
+    return match.group(2).upper(), (stem[: match.start()] + stem[match.end():]).strip("_-. ")
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime]
+
+
+class FolderWatcher:
+    def __init__(
+        self,
+        tar_dir,
+        ecb_dir,
+        output_dir,
+        state_file,
+        stable_seconds=10,
+        max_workers=2,
+        fixed_width_layout_file=None,
+        fixed_width_extensions=(),
+    ):
+        self.tar_dir = tar_dir
+        self.ecb_dir = ecb_dir
+        self.output_dir = output_dir
+        self.state_file = state_file
+        self.stable_seconds = stable_seconds
+        self.max_workers = max_workers
+
+        self._seen = {}  # path -> (size, mtime) from the previous poll
+        self._warned = set()  # names already reported as unpairable
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._fixed_width = (fixed_width_layout_file, fixed_width_extensions)
+        self._pairs = ThreadPoolExecutor(max_workers, thread_name_prefix="reconcile")
+        self._loaders = self._new_loader_pool()
+        self.processed = self._load_state()
+
+    def _new_loader_pool(self):
+        # CSV and fixed-width parsing is CPU-bound Python, so the ECB side is
+        # parsed in a separate process to really overlap with the TAR side
+        return ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_fixed_width,
+            initargs=self._fixed_width,
+        )
+
+    def _replace_broken_loaders(self, broken):
+        """Swap in a fresh loader pool after a worker process died"""
+        with self._lock:
+            if self._loaders is broken:
+                self._loaders = self._new_loader_pool()
+        broken.shutdown(wait=False)
+
+    def _load_state(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        with open(self.state_file) as f:
+            return json.load(f)
+
+    def _warn_once(self, name, message):
+        if name not in self._warned:
+            self._warned.add(name)
+            logger.warning(message)
+
+    def _scan(self, directory, default_side):
+        """Map pair key -> path for files in ``directory`` belonging to one side"""
+        found = {}
+        duplicates = set()
+        for entry in os.scandir(directory):
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            if file_format(entry.name) not in READERS and compression(entry.name) != "zip":
+                continue
+            side, key = pair_key(entry.name)
+            if (side or default_side) != default_side:
+                continue
+            if not key:
+                self._warn_once(entry.path, f"Ignoring {entry.path}: no pair key left in file name")
+                continue
+            if key in found:
+                duplicates.add(key)
+                self._warn_once(
+                    entry.path,
+                    f"Ignoring pair {key}: both {found[key]} and {entry.path} match it",
+                )
+                continue
+            found[key] = entry.path
+        for key in duplicates:
+            del found[key]
+        return found
+
+    def _is_stable(self, path):
+        stat = os.stat(path)
+        current = (stat.st_size, stat.st_mtime)
+        previous = self._seen.get(path)
+        self._seen[path] = current
+        return previous == current and time.time() - stat.st_mtime >= self.stable_seconds
+
+    def _forget_missing(self, present):
+        """Drop poll state for files that have been moved or deleted"""
+        for path in self._seen.keys() - present:
+            del self._seen[path]
+        self._warned &= present
+        with self._lock:
+            gone = [
+                key for key, done in self.processed.items()
+                if key not in self._in_flight
+                and not os.path.exists(done["tar"][0])
+                and not os.path.exists(done["ecb"][0])
+            ]
+            for key in gone:
+                del self.processed[key]
+            if gone:
+                write_json_atomic(self.state_file, self.processed)
+
+    def find_ready_pairs(self):
+        """Return ``(key, tar_path, ecb_path)`` for stable, unprocessed pairs"""
+        tar_files = self._scan(self.tar_dir, "TAR")
+        ecb_files = self._scan(self.ecb_dir, "ECB")
+        self._forget_missing(set(tar_files.values()) | set(ecb_files.values()))
+        ready = []
+        for key in sorted(tar_files.keys() & ecb_files.keys()):
+            tar_path, ecb_path = tar_files[key], ecb_files[key]
+            try:
+                # Evaluate both so each file's size/mtime is recorded on every poll
+                tar_stable = self._is_stable(tar_path)
+                ecb_stable = self._is_stable(ecb_path)
+                if not (tar_stable and ecb_stable) or key in self._in_flight:
+                    continue
+                # Succeeded or failed on these exact files: wait for a new version
+                done = self.processed.get(key)
+                if done and done["tar"] == _signature(tar_path) and done["ecb"] == _signature(ecb_path):
+                    continue
+            except OSError as e:
+                logger.warning(f"Skipping pair {key} this poll: {str(e)}")
+                continue
+            ready.append((key, tar_path, ecb_path))
+        return ready
+
+    def reconcile(self, key, tar_path, ecb_path):
+        # Parse the ECB side in a loader process while this thread parses TAR
+        loaders = self._loaders
+        try:
+            ecb_future = loaders.submit(load_ecb_file, ecb_path)
+            tar_data = load_tar_file(tar_path)
+            ecb_data = ecb_future.result()
+        except BrokenProcessPool:
+            self._replace_broken_loaders(loaders)
+            raise
+
+        comparator = TransactionComparator()
+        discrepancies = comparator.compare_files(tar_data, ecb_data)
+        total_records = len(tar_data.keys() | ecb_data.keys())
+
+        result_path = os.path.join(self.output_dir, f"{key}.json")
+        write_json_atomic(
+            result_path,
+            {
+                "tar_file": tar_path,
+                "ecb_file": ecb_path,
+                "discrepancies": format_discrepancies(discrepancies),
+                "total_records": total_records,
+            },
+        )
+        logger.info(f"Reconciled {key}: {len(discrepancies)} discrepancies -> {result_path}")
+        return result_path
+
+    def _record(self, key, entry):
+        with self._lock:
+            self.processed[key] = entry
+            write_json_atomic(self.state_file, self.processed)
+
+    def _run_pair(self, key, tar_path, ecb_path):
+        try:
+            signatures = {"tar": _signature(tar_path), "ecb": _signature(ecb_path)}
+            try:
+                result_path = self.reconcile(key, tar_path, ecb_path)
+            except BrokenProcessPool:
+                # Infrastructure failure (e.g. OOM-killed loader), not a bad
+                # extract: leave the pair unrecorded so the next poll retries
+                logger.error(f"Loader process died while reconciling {key}, will retry")
+            except Exception as e:
+                # Recorded so a bad extract is retried only once it changes
+                logger.error(f"Error reconciling {key}: {str(e)}")
+                self._record(key, dict(signatures, error=str(e)))
+            else:
+                self._record(key, dict(signatures, result=result_path))
+        except Exception as e:
+            logger.error(f"Error recording state for {key}: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def poll_once(self):
+        try:
+            ready = self.find_ready_pairs()
+        except Exception as e:
+            logger.error(f"Error scanning watch folders: {str(e)}")
+            return
+        for key, tar_path, ecb_path in ready:
+            with self._lock:
+                self._in_flight.add(key)
+            logger.info(f"Queueing pair {key}: TAR={tar_path}, ECB={ecb_path}")
+            self._pairs.submit(self._run_pair, key, tar_path, ecb_path)
+
+    def run(self, interval=30):
+        for directory in (self.tar_dir, self.ecb_dir, self.output_dir):
+            os.makedirs(directory, exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+        logger.info(
+            f"Watching TAR={self.tar_dir}, ECB={self.ecb_dir} every {interval}s "
+            f"(max {self.max_workers} concurrent reconciliations)"
+        )
+        try:
+            while True:
+                self.poll_once()
+                time.sleep(interval)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._pairs.shutdown(wait=True)
+        self._loaders.shutdown(wait=True)
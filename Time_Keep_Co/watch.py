@@ -0,0 +1,38 @@
+import os
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from utils.data_loader import configure_fixed_width
+from utils.watcher import FolderWatcher
+
+if __name__ == "__main__":
+    # Configure logging here: spawned loader processes re-import this module
+    # and must not open their own handle on watch.log
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler('watch.log')
+        ]
+    )
+
+    logger.info("Starting Dell File Comparator watch-folder daemon...")
+    configure_fixed_width(Config.FIXED_WIDTH_LAYOUT_FILE, Config.FIXED_WIDTH_EXTENSIONS)
+    watcher = FolderWatcher(
+        tar_dir=Config.WATCH_TAR_DIR,
+        ecb_dir=Config.WATCH_ECB_DIR,
+        output_dir=Config.WATCH_OUTPUT_DIR,
+        state_file=Config.WATCH_STATE_FILE,
+        stable_seconds=Config.WATCH_STABLE_SECONDS,
+        max_workers=Config.WATCH_MAX_WORKERS,
+        fixed_width_layout_file=Config.FIXED_WIDTH_LAYOUT_FILE,
+        fixed_width_extensions=Config.FIXED_WIDTH_EXTENSIONS,
+    )
+    watcher.run(interval=Config.WATCH_INTERVAL)